@@ -1,5 +1,4 @@
 from dotenv import load_dotenv
-import os
 from pathlib import Path
 
 # Load environment variables from .env file FIRST, before any other imports
@@ -8,11 +7,21 @@ from pathlib import Path
 env_path = Path(__file__).parent.parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from app.routes import financial
-import app.services.edgar_init  # Initialize EdgarTools with identity
+from app.services import cache, edgar_init
+from app.services.edgar import (
+    init_http_client,
+    close_http_client,
+    stop_convex_writer,
+)
 import logging
+import orjson
 
 # Configure logging
 logging.basicConfig(
@@ -20,26 +29,57 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
-app = FastAPI(title="Storcky API", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Set the EdgarTools identity at startup rather than on import, so workers
+    # don't pay for it before binding. EdgarService also ensures it on first use.
+    edgar_init.ensure_edgar_initialized()
+    await asyncio.to_thread(edgar_init.warm_ticker_lookup)
+    init_http_client()
+    await cache.init_cache()
+    yield
+    await cache.close_cache()
+    # Post queued Convex writes while the shared client is still open
+    await asyncio.to_thread(stop_convex_writer)
+    close_http_client()
+
+
+app = FastAPI(
+    title="Storcky API",
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://localhost:3001"],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["authorization", "content-type"],
+    # Let browsers cache preflight responses for a day
+    max_age=86400,
 )
 
+# Compress JSON payloads; repeated tags and dates compress well
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Include routers
 app.include_router(financial.router, prefix="/api", tags=["financial"])
 
 
+# Constant payloads, serialized once; /health is polled by load balancers
+_ROOT_BODY = orjson.dumps({"message": "Storcky API", "version": "0.1.0"})
+_HEALTH_BODY = orjson.dumps({"status": "healthy"})
+
+
 @app.get("/")
 async def root():
-    return {"message": "Storcky API", "version": "0.1.0"}
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
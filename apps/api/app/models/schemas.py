@@ -1,5 +1,4 @@
 from datetime import date, datetime
-from decimal import Decimal
 from typing import Optional
 from pydantic import BaseModel, Field
 
@@ -49,3 +48,17 @@ class CompanyFactsResponse(BaseModel):
     company: CompanyInfo
     concepts: list[Concept] = Field(default_factory=list)
     periods: list[FactPeriod] = Field(default_factory=list)
+
+
+class BatchFactsRequest(BaseModel):
+    """Request body for fetching facts for several tickers at once."""
+
+    tickers: list[str] = Field(..., min_length=1, max_length=50)
+
+
+class BatchFactsError(BaseModel):
+    """A failed entry in a batch facts response."""
+
+    ticker: str
+    status: int = Field(..., description="HTTP status the single-ticker route would return")
+    error: str
@@ -1,36 +1,105 @@
 """
 Financial data API routes.
 """
-from fastapi import APIRouter, HTTPException
-from app.services.edgar import EdgarService, CompanyNotFoundError, EdgarUnavailableError
-from app.models.schemas import CompanyFactsResponse
+import asyncio
+from typing import Dict, Iterator, List, Tuple, Union
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+import orjson
+from app.services.edgar import (
+    EdgarService,
+    CompanyNotFoundError,
+    EdgarRateLimitedError,
+    EdgarUnavailableError,
+)
+from app.services import cache
+from app.models.schemas import BatchFactsError, BatchFactsRequest, CompanyFactsResponse
 
 
 router = APIRouter()
 
+PERIOD_TYPE = "quarterly"
+PERIOD_LIMIT = 4
+# Max tickers fetched concurrently by the batch route
+BATCH_CONCURRENCY = 8
+# Browsers/CDNs may reuse a response this long before revalidating with ETag
+CLIENT_MAX_AGE_SECONDS = 3600
+# SEC blocks offending clients for ~10 minutes when no Retry-After is given
+DEFAULT_RETRY_AFTER_SECONDS = 600
 
-@router.get("/financial/{ticker}", response_model=CompanyFactsResponse)
-async def get_financial_data(ticker: str):
+# In-flight loads keyed by ticker, so concurrent requests share one fetch
+_in_flight: Dict[str, "asyncio.Task[Tuple[Union[bytes, str], str, str]]"] = {}
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weakly compare an If-None-Match header value (possibly a list) against etag."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(",")
+    )
+
+
+async def _load_company_facts(
+    ticker_upper: str,
+) -> Tuple[Union[bytes, str], str, str]:
     """
-    Get company financial facts for a given ticker symbol.
-    
-    Returns CompanyFactsResponse containing:
-    - company: Company identification information
-    - concepts: List of financial concepts
-    - periods: List of fact periods
-    - facts: List of company facts linking concepts to periods with values
+    Load the serialized CompanyFactsResponse for a ticker, coalescing requests.
+
+    Concurrent callers for the same ticker await a single in-flight load
+    instead of each missing the cache and hitting EDGAR.
     """
-    ticker_upper = ticker.upper()
-    
+    task = _in_flight.get(ticker_upper)
+    if task is None:
+        task = asyncio.create_task(_fetch_company_facts(ticker_upper))
+        _in_flight[ticker_upper] = task
+        task.add_done_callback(lambda _: _in_flight.pop(ticker_upper, None))
+    # Shield so one cancelled client doesn't cancel the load for the others
+    return await asyncio.shield(task)
+
+
+async def _fetch_company_facts(
+    ticker_upper: str,
+) -> Tuple[Union[bytes, str], str, str]:
+    """
+    Load the serialized CompanyFactsResponse for a ticker.
+
+    Returns a tuple of (JSON body, ETag, cache status) where cache status is
+    one of HIT, MISS or STALE. Service errors are mapped to HTTPExceptions.
+    """
+    cache_key = cache.financial_cache_key(ticker_upper, PERIOD_TYPE, PERIOD_LIMIT)
+
+    cached = await cache.get_cached(cache_key)
+    if cached is not None:
+        body, etag = cached
+        return body, etag, "HIT"
+
     try:
-        response = EdgarService.get_company_facts(ticker_upper, period_type="quarterly", limit=4)
-        return response
+        # EdgarService is synchronous (edgartools); keep it off the event loop
+        facts_response = await asyncio.to_thread(
+            EdgarService.get_company_facts,
+            ticker_upper,
+            period_type=PERIOD_TYPE,
+            limit=PERIOD_LIMIT,
+        )
     except CompanyNotFoundError as e:
         raise HTTPException(
             status_code=404,
             detail=str(e)
         )
     except EdgarUnavailableError as e:
+        stale = await cache.get_stale(cache_key)
+        if stale is not None:
+            body, etag = stale
+            return body, etag, "STALE"
+        if isinstance(e, EdgarRateLimitedError):
+            retry_after = e.retry_after or DEFAULT_RETRY_AFTER_SECONDS
+            raise HTTPException(
+                status_code=429,
+                detail=str(e),
+                headers={"Retry-After": str(retry_after)},
+            )
         raise HTTPException(
             status_code=503,
             detail=str(e)
@@ -40,3 +109,92 @@ async def get_financial_data(ticker: str):
             status_code=500,
             detail=f"Error fetching financial data: {str(e)}"
         )
+
+    # Serialize once; the same bytes go to the cache and the client
+    body = facts_response.model_dump_json()
+    etag = await cache.set_cached(cache_key, body, cache.ttl_for(facts_response))
+    return body, etag, "MISS"
+
+
+def _ndjson_lines(body: Union[bytes, str]) -> Iterator[bytes]:
+    """Yield a header line (company and concepts) followed by one line per period."""
+    data = orjson.loads(body)
+    yield orjson.dumps({"company": data["company"], "concepts": data["concepts"]}) + b"\n"
+    for period in data["periods"]:
+        yield orjson.dumps(period) + b"\n"
+
+
+@router.get("/financial/{ticker}", response_model=CompanyFactsResponse)
+async def get_financial_data(ticker: str, request: Request):
+    """
+    Get company financial facts for a given ticker symbol.
+
+    Returns CompanyFactsResponse containing:
+    - company: Company identification information
+    - concepts: List of financial concepts
+    - periods: List of fact periods
+    - facts: List of company facts linking concepts to periods with values
+
+    Responses are served from the Redis cache when available (X-Cache: HIT),
+    and a stale copy is served if EDGAR is unavailable (X-Cache: STALE).
+    Supports conditional GET: a matching If-None-Match returns 304.
+    """
+    body, etag, cache_status = await _load_company_facts(ticker.upper())
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={CLIENT_MAX_AGE_SECONDS}",
+        "X-Cache": cache_status,
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    # Body is already serialized JSON, so skip response_model re-validation
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/financial/{ticker}/stream")
+async def stream_financial_data(ticker: str):
+    """
+    Stream company financial facts as NDJSON.
+
+    The first line holds company and concepts; each following line is one
+    FactPeriod, so clients can start rendering before the body is complete.
+    """
+    body, _, cache_status = await _load_company_facts(ticker.upper())
+    return StreamingResponse(
+        _ndjson_lines(body),
+        media_type="application/x-ndjson",
+        headers={"X-Cache": cache_status},
+    )
+
+
+@router.post(
+    "/financial/batch",
+    response_model=List[Union[CompanyFactsResponse, BatchFactsError]],
+)
+async def get_financial_data_batch(request: BatchFactsRequest):
+    """
+    Get company financial facts for several tickers concurrently.
+
+    Returns one entry per unique ticker, in request order. Tickers that fail
+    yield a BatchFactsError entry instead of failing the whole batch.
+    """
+    tickers = list(dict.fromkeys(t.upper() for t in request.tickers))
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def load(ticker_upper: str) -> bytes:
+        async with semaphore:
+            try:
+                body, _, _ = await _load_company_facts(ticker_upper)
+            except HTTPException as e:
+                error = BatchFactsError(
+                    ticker=ticker_upper, status=e.status_code, error=str(e.detail)
+                )
+                return error.model_dump_json().encode()
+        return body.encode() if isinstance(body, str) else body
+
+    parts = await asyncio.gather(*(load(t) for t in tickers))
+    # Entries are already JSON, so join them rather than re-serializing
+    return Response(content=b"[" + b",".join(parts) + b"]", media_type="application/json")
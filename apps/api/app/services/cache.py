@@ -0,0 +1,183 @@
+"""
+Two-level response cache for financial data routes.
+
+L1 is a small per-worker in-process LRU; L2 is Redis. Redis is optional: when
+REDIS_URL is not set (or Redis is unreachable) only L1 is used and L2 lookups
+are treated as misses.
+"""
+
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Optional, Tuple, Union
+import redis.asyncio as redis
+import hashlib
+import logging
+import os
+import time
+
+from app.models.schemas import CompanyFactsResponse
+
+logger = logging.getLogger(__name__)
+
+# TTL policies (seconds). Filings land at most quarterly, so hours are safe.
+SHORT_TTL = 15 * 60
+NORMAL_TTL = 6 * 3600
+LONG_TTL = 24 * 3600
+
+# L1 entries filled from Redis don't know their remaining TTL, so cap them
+LOCAL_TTL = 5 * 60
+LOCAL_MAXSIZE = 256
+
+# A cached serialized response and its ETag
+CachedPayload = Tuple[Union[bytes, str], str]
+
+_client: Optional[redis.Redis] = None
+# key -> (expires_at monotonic seconds, payload, etag)
+_local: "OrderedDict[str, Tuple[float, Union[bytes, str], str]]" = OrderedDict()
+
+
+async def init_cache() -> None:
+    """Create the Redis client if REDIS_URL is configured."""
+    global _client
+    url = os.getenv("REDIS_URL")
+    if not url:
+        logger.debug("REDIS_URL not set, using in-process response cache only")
+        return
+    _client = redis.from_url(url)
+    logger.info("Response cache enabled")
+
+
+async def close_cache() -> None:
+    """Close the Redis client, if one was created."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _local_get(key: str) -> Optional[CachedPayload]:
+    entry = _local.get(key)
+    if entry is None:
+        return None
+    expires_at, payload, etag = entry
+    if expires_at <= time.monotonic():
+        del _local[key]
+        return None
+    _local.move_to_end(key)
+    return payload, etag
+
+
+def _local_set(key: str, payload: Union[bytes, str], etag: str, ttl: int) -> None:
+    _local[key] = (time.monotonic() + ttl, payload, etag)
+    _local.move_to_end(key)
+    while len(_local) > LOCAL_MAXSIZE:
+        _local.popitem(last=False)
+
+
+def clear_local_cache() -> None:
+    """Drop every L1 entry."""
+    _local.clear()
+
+
+def financial_cache_key(ticker: str, period_type: str, limit: int) -> str:
+    """Build the cache key for a financial facts response."""
+    return f"ff:{ticker}:{period_type}:{limit}"
+
+
+def _stale_key(key: str) -> str:
+    return f"ff:stale:{key[len('ff:'):]}"
+
+
+def _etag_key(key: str) -> str:
+    return f"{key}:etag"
+
+
+def etag_for(payload: Union[bytes, str]) -> str:
+    """
+    ETag for a serialized payload.
+
+    Weak, because GZipMiddleware may send the same payload gzip-encoded or
+    not, and a strong tag must identify the exact bytes on the wire.
+    """
+    if isinstance(payload, str):
+        payload = payload.encode()
+    return f'W/"{hashlib.sha1(payload).hexdigest()}"'
+
+
+async def _redis_get(key: str) -> Optional[CachedPayload]:
+    """Read a payload and its ETag from Redis; entries without one get it computed."""
+    payload, etag = await _client.mget(key, _etag_key(key))
+    if payload is None:
+        return None
+    return payload, etag.decode() if etag is not None else etag_for(payload)
+
+
+def ttl_for(response: CompanyFactsResponse) -> int:
+    """
+    Pick a TTL policy for a response.
+
+    Empty responses are cached briefly. Otherwise the TTL depends on how long
+    ago the latest period ended: right after a filing the next one is months
+    away, while an old period means a new 10-Q/10-K is due soon.
+    """
+    if not response.periods:
+        return SHORT_TTL
+    latest_end = max(p.end_date for p in response.periods)
+    age = date.today() - latest_end
+    if age < timedelta(days=60):
+        return LONG_TTL
+    if age < timedelta(days=90):
+        return NORMAL_TTL
+    return SHORT_TTL
+
+
+async def get_cached(key: str) -> Optional[CachedPayload]:
+    """Return (payload, etag) for key from L1, then Redis; None on miss or error."""
+    entry = _local_get(key)
+    if entry is not None:
+        return entry
+    if _client is None:
+        return None
+    try:
+        entry = await _redis_get(key)
+    except Exception as e:
+        logger.warning(f"Failed to read response cache: {e}")
+        return None
+    if entry is not None:
+        payload, etag = entry
+        _local_set(key, payload, etag, LOCAL_TTL)
+    return entry
+
+
+async def get_stale(key: str) -> Optional[CachedPayload]:
+    """Return the last known (payload, etag) for key, ignoring TTL."""
+    if _client is None:
+        return None
+    try:
+        return await _redis_get(_stale_key(key))
+    except Exception as e:
+        logger.warning(f"Failed to read stale response cache: {e}")
+        return None
+
+
+async def set_cached(key: str, payload: str, ttl: int) -> str:
+    """
+    Store payload under key with ttl, and keep a non-expiring stale copy in Redis.
+
+    Returns the payload's ETag, computed once here and stored alongside it.
+    """
+    etag = etag_for(payload)
+    _local_set(key, payload, etag, ttl)
+    if _client is None:
+        return etag
+    stale_key = _stale_key(key)
+    try:
+        async with _client.pipeline(transaction=False) as pipe:
+            pipe.setex(key, ttl, payload)
+            pipe.setex(_etag_key(key), ttl, etag)
+            pipe.set(stale_key, payload)
+            pipe.set(_etag_key(stale_key), etag)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to write response cache: {e}")
+    return etag
@@ -2,25 +2,67 @@
 Service for fetching financial data from SEC EDGAR using EdgarTools.
 """
 
-from decimal import Decimal
 from datetime import date, datetime
-from typing import Optional, Dict, Any, Tuple
-from edgar import Company
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import attrgetter
+from typing import Optional, Dict, Any, List, Tuple, Union
+from cachetools import TTLCache, cached
+from edgar import Company, TooManyRequestsError
+from app.services.edgar_init import ensure_edgar_initialized
 from app.models.schemas import (
     CompanyInfo,
-    CompanyFact,
-    FactPeriod,
     Concept,
     CompanyFactsResponse,
 )
-import pandas as pd
 import logging
-import json
+import atexit
+import base64
+import importlib.util
 import os
+import queue
+import threading
+import time
+import zlib
 import httpx
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Shared HTTP client for Convex calls so connections are reused across requests.
+# edgartools keeps its own pooled client for SEC traffic.
+_http_client: Optional[httpx.Client] = None
+_http_client_lock = threading.Lock()
+
+_JSON_HEADERS = {"content-type": "application/json"}
+# HTTP/2 needs the h2 package (httpx[http2]); fall back to HTTP/1.1 without it
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Short-lived in-process caches so hot tickers skip Convex and EDGAR round trips.
+# A Company pins its EntityFacts once loaded (tens of MB for a large filer), so
+# like edgartools' own facts cache keep only a couple; the response cache
+# absorbs repeat hits.
+CACHE_TTL_SECONDS = 300
+COMPANY_CACHE_MAXSIZE = 2
+_company_cache: TTLCache = TTLCache(maxsize=COMPANY_CACHE_MAXSIZE, ttl=CACHE_TTL_SECONDS)
+_convex_facts_cache: TTLCache = TTLCache(maxsize=512, ttl=CACHE_TTL_SECONDS)
+_cache_lock = threading.Lock()
+
+# zlib level for the facts blob stored in Convex; higher levels gain little
+FACTS_BLOB_COMPRESSLEVEL = 6
+
+# Background pool for I/O that can overlap with the EDGAR fetch (Convex lookups).
+_io_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="edgar-io")
+# Convex writes run off the request path on one background thread. Writes that
+# arrive within CONVEX_WRITE_FLUSH_SECONDS are sent as a single batch mutation.
+CONVEX_WRITE_BATCH_SIZE = 32
+CONVEX_WRITE_FLUSH_SECONDS = 0.25
+_convex_write_queue: "queue.Queue[Tuple[str, CompanyFactsResponse, datetime]]" = (
+    queue.Queue()
+)
+_convex_writer: Optional[threading.Thread] = None
+_convex_writer_lock = threading.Lock()
+
 
 class CompanyNotFoundError(Exception):
     """Raised when a company cannot be found by identifier."""
@@ -34,6 +76,15 @@ class EdgarUnavailableError(Exception):
     pass
 
 
+class EdgarRateLimitedError(EdgarUnavailableError):
+    """Raised when SEC rejects requests for exceeding its rate limit."""
+
+    def __init__(self, message: str, retry_after: Optional[int] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@lru_cache(maxsize=1024)
 def _normalize_cik(cik: str) -> str:
     """Normalize CIK to 10-digit zero-padded string."""
     try:
@@ -43,6 +94,7 @@ def _normalize_cik(cik: str) -> str:
         return cik
 
 
+@lru_cache(maxsize=1024)
 def _is_cik(identifier: str) -> bool:
     """Check if identifier looks like a CIK (numeric)."""
     try:
@@ -52,22 +104,82 @@ def _is_cik(identifier: str) -> bool:
         return False
 
 
+def init_http_client() -> httpx.Client:
+    """Create the shared HTTP client if it does not exist yet."""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                # Multiplex Convex queries and background writes over one
+                # connection; servers without h2 negotiate HTTP/1.1 via ALPN
+                http2=_HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+                timeout=12.0,
+            )
+        return _http_client
+
+
+def close_http_client() -> None:
+    """Close the shared HTTP client, if one was created."""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
+
+
+# Scripts that never run the app lifespan still release pooled connections
+atexit.register(close_http_client)
+
+
+def clear_edgar_caches() -> None:
+    """Drop the in-process Company and Convex caches."""
+    with _cache_lock:
+        _company_cache.clear()
+        _convex_facts_cache.clear()
+
+
+@cached(_company_cache, lock=_cache_lock)
+def _get_company(identifier: Union[str, int]) -> Company:
+    """Construct (or reuse) the Company for a ticker (upper-cased) or integer CIK."""
+    return Company(identifier)
+
+
+@lru_cache(maxsize=1)
 def _get_convex_url() -> Optional[str]:
-    """Get Convex URL from environment variable."""
+    """Get Convex URL from environment variable (read once per process)."""
     url = os.getenv("CONVEX_URL")
     if not url:
         logger.debug("CONVEX_URL environment variable not set")
     else:
         logger.debug(
-            f"CONVEX_URL found: {url[:50]}..."
-            if len(url) > 50
-            else f"CONVEX_URL found: {url}"
+            "CONVEX_URL found: %.50s%s", url, "..." if len(url) > 50 else ""
         )
     return url
 
 
 def _query_convex_facts(
     ticker: str,
+) -> Tuple[Optional[CompanyFactsResponse], Optional[datetime]]:
+    """
+    Query Convex for cached company facts by ticker, via the in-process cache.
+    Returns a tuple of (CompanyFactsResponse, filing_date) or (None, None) if not found.
+    """
+    with _cache_lock:
+        hit = _convex_facts_cache.get(ticker)
+    if hit is not None:
+        return hit
+
+    result = _fetch_convex_facts(ticker)
+    # Only cache found rows so misses and transient errors are retried
+    if result[0] is not None:
+        with _cache_lock:
+            _convex_facts_cache[ticker] = result
+    return result
+
+
+def _fetch_convex_facts(
+    ticker: str,
 ) -> Tuple[Optional[CompanyFactsResponse], Optional[datetime]]:
     """
     Query Convex for cached company facts by ticker.
@@ -83,47 +195,95 @@ def _query_convex_facts(
         query_url = f"{convex_url}/api/query"
 
         # Call the getCompanyFactsByTicker query
-        with httpx.Client(timeout=5.0) as client:
-            response = client.post(
-                query_url,
-                json={
+        response = init_http_client().post(
+            query_url,
+            content=orjson.dumps(
+                {
                     "path": "companyFacts:getCompanyFactsByTicker",
                     "args": {"ticker": ticker},
                     "format": "json",
-                },
-            )
-            response.raise_for_status()
-            result = response.json()
-
-            # Convex HTTP API returns: {"status": "success", "value": {...}, "logLines": [...]}
-            if isinstance(result, dict):
-                if result.get("status") == "error":
-                    logger.warning(f"Convex query error: {result.get('errorMessage')}")
-                    return None, None
-                if result.get("status") == "success":
-                    value = result.get("value")
-                    if value is None:
-                        return None, None
-
-                    # Extract filing date
-                    filing_date_ts = value.get("filingDate")
-                    filing_date = None
-                    if filing_date_ts:
-                        filing_date = datetime.fromtimestamp(filing_date_ts / 1000)
-
-                    # Deserialize the CompanyFactsResponse from the cached data
-                    facts_data = value.get("facts")
-                    if facts_data:
-                        facts_response = _deserialize_company_facts_response(facts_data)
-                        return facts_response, filing_date
+                }
+            ),
+            headers=_JSON_HEADERS,
+            timeout=5.0,
+        )
+        response.raise_for_status()
+        result = orjson.loads(response.content)
+
+        # Convex HTTP API returns: {"status": "success", "value": {...}, "logLines": [...]}
+        if isinstance(result, dict):
+            if result.get("status") == "error":
+                logger.warning(f"Convex query error: {result.get('errorMessage')}")
+                return None, None
+            if result.get("status") == "success":
+                value = result.get("value")
+                if value is None:
                     return None, None
 
-            return None, None
+                # Extract filing date
+                filing_date_ts = value.get("filingDate")
+                filing_date = None
+                if filing_date_ts:
+                    filing_date = datetime.fromtimestamp(filing_date_ts / 1000)
+
+                # Deserialize the CompanyFactsResponse from the cached data
+                facts_data = value.get("facts")
+                if facts_data:
+                    facts_response = _deserialize_company_facts_response(facts_data)
+                    return facts_response, filing_date
+                return None, None
+
+        return None, None
     except Exception as e:
         logger.warning(f"Failed to query Convex for facts: {e}")
         return None, None
 
 
+def _convex_facts_record(
+    ticker: str, response: CompanyFactsResponse, filing_date: datetime
+) -> Dict[str, Any]:
+    """Build the storeCompanyFacts arguments for one ticker."""
+    # Convert filing_date to timestamp (milliseconds)
+    filing_timestamp = (
+        int(filing_date.timestamp() * 1000)
+        if isinstance(filing_date, datetime)
+        else int(filing_date)
+    )
+    return {
+        "ticker": ticker,
+        # Serialize CompanyFactsResponse to a compressed JSON blob
+        "facts": _serialize_company_facts_response(response),
+        "filingDate": filing_timestamp,
+    }
+
+
+def _run_convex_mutation(convex_url: str, path: str, args: Dict[str, Any]) -> bool:
+    """
+    Run a Convex mutation over the HTTP API.
+    Returns True if successful, False otherwise.
+    """
+    # Convex HTTP API endpoint for mutations
+    mutation_url = f"{convex_url}/api/mutation"
+
+    http_response = init_http_client().post(
+        mutation_url,
+        content=orjson.dumps({"path": path, "args": args, "format": "json"}),
+        headers=_JSON_HEADERS,
+        timeout=10.0,
+    )
+    http_response.raise_for_status()
+    result = orjson.loads(http_response.content)
+
+    # Convex HTTP API returns: {"status": "success", "value": {...}, "logLines": [...]}
+    if isinstance(result, dict):
+        if result.get("status") == "error":
+            logger.warning(f"Convex mutation error: {result.get('errorMessage')}")
+            return False
+        if result.get("status") == "success":
+            return True
+    return False
+
+
 def _store_convex_facts(
     ticker: str, response: CompanyFactsResponse, filing_date: datetime
 ) -> bool:
@@ -131,175 +291,227 @@ def _store_convex_facts(
     Store company facts in Convex. Always inserts a new record.
     Returns True if successful, False otherwise.
     """
+    return _store_convex_facts_batch([(ticker, response, filing_date)])
+
+
+def _store_convex_facts_batch(
+    records: List[Tuple[str, CompanyFactsResponse, datetime]],
+) -> bool:
+    """
+    Store company facts for several tickers in one Convex mutation.
+    If the batch fails, each record is retried on its own so one bad record
+    doesn't drop the rest. Always inserts new records. Returns True if every
+    record was stored, False otherwise.
+    """
     convex_url = _get_convex_url()
     if not convex_url:
         logger.debug("CONVEX_URL not set, skipping Convex store")
         return False
 
     try:
-        # Convex HTTP API endpoint for mutations
-        mutation_url = f"{convex_url}/api/mutation"
-
-        # Convert filing_date to timestamp (milliseconds)
-        filing_timestamp = (
-            int(filing_date.timestamp() * 1000)
-            if isinstance(filing_date, datetime)
-            else int(filing_date)
-        )
-
-        # Serialize CompanyFactsResponse to JSON
-        facts_json = _serialize_company_facts_response(response)
-
-        # Call the storeCompanyFacts mutation
-        with httpx.Client(timeout=10.0) as client:
-            response = client.post(
-                mutation_url,
-                json={
-                    "path": "companyFacts:storeCompanyFacts",
-                    "args": {
-                        "ticker": ticker,
-                        "facts": facts_json,
-                        "filingDate": filing_timestamp,
-                    },
-                    "format": "json",
-                },
+        if len(records) == 1:
+            stored = _run_convex_mutation(
+                convex_url,
+                "companyFacts:storeCompanyFacts",
+                _convex_facts_record(*records[0]),
+            )
+        else:
+            stored = _run_convex_mutation(
+                convex_url,
+                "companyFacts:storeCompanyFactsBatch",
+                {"records": [_convex_facts_record(*record) for record in records]},
             )
-            response.raise_for_status()
-            result = response.json()
-
-            # Convex HTTP API returns: {"status": "success", "value": {...}, "logLines": [...]}
-            if isinstance(result, dict):
-                if result.get("status") == "error":
-                    logger.warning(
-                        f"Convex mutation error: {result.get('errorMessage')}"
-                    )
-                    return False
-                if result.get("status") == "success":
-                    return True
-
-            return False
     except Exception as e:
         logger.warning(f"Failed to store facts in Convex: {e}")
+        stored = False
+
+    if stored:
+        with _cache_lock:
+            for ticker, response, filing_date in records:
+                _convex_facts_cache[ticker] = (response, filing_date)
+        return True
+    if len(records) == 1:
+        logger.warning(f"Dropped Convex facts for {records[0][0]}")
         return False
 
+    # One bad record fails the whole mutation; post them one by one instead
+    results = [_store_convex_facts_batch([record]) for record in records]
+    return all(results)
+
+
+def _convex_writer_loop() -> None:
+    """Drain the write queue, grouping writes that arrive close together."""
+    stop = False
+    while not stop:
+        item = _convex_write_queue.get()
+        if item is None:
+            _convex_write_queue.task_done()
+            return
+        batch = [item]
+        deadline = time.monotonic() + CONVEX_WRITE_FLUSH_SECONDS
+        while len(batch) < CONVEX_WRITE_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = _convex_write_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Stop requested: store what we have, then exit
+                _convex_write_queue.task_done()
+                stop = True
+                break
+            batch.append(item)
+        try:
+            if _store_convex_facts_batch(batch):
+                logger.info(f"Stored facts in Convex for {len(batch)} ticker(s)")
+        except Exception as e:
+            logger.warning(f"Convex writer failed: {e}")
+        finally:
+            for _ in batch:
+                _convex_write_queue.task_done()
 
-def _extract_most_recent_filing_date(facts) -> Optional[datetime]:
-    """
-    Extract the most recent filing_date from the EntityFacts object.
-    Returns the most recent filing_date as a datetime, or None if not found.
-    """
-    if not facts:
-        return None
 
-    max_filing_date = None
+def _enqueue_convex_store(
+    ticker: str, response: CompanyFactsResponse, filing_date: datetime
+) -> None:
+    """Queue facts for the background Convex writer, starting it on first use."""
+    global _convex_writer
+    with _convex_writer_lock:
+        if _convex_writer is None:
+            _convex_writer = threading.Thread(
+                target=_convex_writer_loop, name="convex-write", daemon=True
+            )
+            _convex_writer.start()
+    _convex_write_queue.put((ticker, response, filing_date))
 
-    try:
-        # Query a few key tags to find the most recent filing date
-        # We don't need to query all facts, just a sample
-        key_tags = [
-            "Revenues",
-            "RevenueFromContractWithCustomerExcludingAssessedTax",
-            "NetIncomeLoss",
-        ]
-
-        for tag in key_tags:
-            try:
-                query = (
-                    facts.query().by_concept(tag).sort_by("period_end", ascending=False)
-                )
-                matched = query.execute()
-                if matched:
-                    for f in matched[:5]:  # Check first 5 results
-                        filed = getattr(f, "filing_date", None)
-                        if filed:
-                            if isinstance(filed, datetime):
-                                filing_dt = filed
-                            elif isinstance(filed, date):
-                                # Convert date to datetime at midnight for comparison
-                                filing_dt = datetime.combine(filed, datetime.min.time())
-                            elif isinstance(filed, str):
-                                try:
-                                    filing_dt = datetime.fromisoformat(
-                                        filed.replace("Z", "+00:00")
-                                    )
-                                except:
-                                    continue
-                            else:
-                                continue
-
-                            if max_filing_date is None or filing_dt > max_filing_date:
-                                max_filing_date = filing_dt
-            except Exception:
-                continue
-
-        return max_filing_date
-    except Exception as e:
-        logger.warning(f"Error extracting filing date: {e}")
-        return None
 
+def flush_convex_writes() -> None:
+    """Block until every queued Convex write has been attempted."""
+    _convex_write_queue.join()
+
+
+def stop_convex_writer() -> None:
+    """Post every queued Convex write, then stop the background writer."""
+    global _convex_writer
+    with _convex_writer_lock:
+        writer, _convex_writer = _convex_writer, None
+    if writer is None:
+        return
+    # Queued behind any pending writes, so they are all posted before it exits
+    _convex_write_queue.put(None)
+    writer.join()
+
+
+# Registered after close_http_client, so it runs first at exit
+atexit.register(stop_convex_writer)
 
-def _serialize_facts_to_json(facts) -> Optional[Dict[str, Any]]:
-    """
-    Serialize EntityFacts object to a JSON-compatible dictionary.
-    Returns None if serialization fails.
-    """
-    if not facts:
-        return None
 
+def _parse_iso(value: str) -> Optional[datetime]:
+    """Parse an ISO 8601 string (with optional trailing Z); None if malformed."""
+    if value.endswith("Z"):
+        # fromisoformat only accepts "Z" from Python 3.11
+        value = value[:-1] + "+00:00"
     try:
-        # Try to get the raw JSON representation if available
-        if hasattr(facts, "to_dict"):
-            return facts.to_dict()
-        elif hasattr(facts, "__dict__"):
-            # Convert to dict and handle datetime objects
-            result = {}
-            for key, value in facts.__dict__.items():
-                if isinstance(value, datetime):
-                    result[key] = value.isoformat()
-                elif isinstance(value, date):
-                    result[key] = value.isoformat()
-                elif hasattr(value, "__dict__"):
-                    result[key] = _serialize_facts_to_json(value)
-                else:
-                    try:
-                        json.dumps(value)  # Test if serializable
-                        result[key] = value
-                    except (TypeError, ValueError):
-                        result[key] = str(value)
-            return result
-        else:
-            # Fallback: convert to string representation
-            # This is not ideal but ensures we can store something
-            return {"_serialized": str(facts)}
-    except Exception as e:
-        logger.warning(f"Error serializing facts: {e}")
+        return datetime.fromisoformat(value)
+    except ValueError:
         return None
 
 
-def _deserialize_facts_from_json(facts_json: Dict[str, Any]):
+def _date_to_datetime(filed: date) -> datetime:
+    # Midnight, so dates compare with datetimes
+    return datetime.combine(filed, datetime.min.time())
+
+
+# Exact-type converters for filing_date values; edgartools facts use date
+_FILED_CONVERTERS = {
+    date: _date_to_datetime,
+    datetime: lambda filed: filed,
+    str: _parse_iso,
+}
+
+
+def _filing_datetime(filed) -> Optional[datetime]:
+    """Normalize a fact's filing_date (datetime, date or ISO string) to a datetime."""
+    convert = _FILED_CONVERTERS.get(type(filed))
+    if convert is not None:
+        return convert(filed)
+    # Subclasses (e.g. pandas Timestamp) miss the exact-type lookup
+    if isinstance(filed, datetime):
+        return filed
+    if isinstance(filed, date):
+        return _date_to_datetime(filed)
+    if isinstance(filed, str):
+        return _parse_iso(filed)
+    return None
+
+
+def _max_filing_date(matched, current: Optional[datetime]) -> Optional[datetime]:
     """
-    Deserialize JSON facts data back to a format that can be used.
-    For now, we'll need to reconstruct the EntityFacts-like structure.
-    This is a simplified version - in practice, we may need to work with the raw data.
+    Return the later of current and the filing dates of the newest facts in matched.
+
+    matched must be sorted newest period first; only the first 5 are checked.
     """
-    # For now, return the JSON as-is since we'll process it directly
-    # The actual EntityFacts object reconstruction would be complex
-    return facts_json
+    for f in matched[:5]:
+        filing_dt = _filing_datetime(getattr(f, "filing_date", None))
+        if filing_dt and (current is None or filing_dt > current):
+            current = filing_dt
+    return current
+
+
+# FinancialFact fields read for every row in the main loop, in one C-level call
+_FACT_FIELDS = attrgetter(
+    "fiscal_period",
+    "numeric_value",
+    "period_end",
+    "period_start",
+    "accession",
+    "filing_date",
+)
+
+# Fiscal periods kept for each period_type filter. Quarterly keeps FY because
+# the fourth quarter is only reported inside the annual filing.
+_ALLOWED_FISCAL_PERIODS: Dict[str, frozenset] = {
+    "annual": frozenset({"FY"}),
+    "quarterly": frozenset({"Q1", "Q2", "Q3", "FY"}),
+}
+
 
+def _facts_by_concept(facts, tags: List[str]) -> Dict[str, list]:
+    """
+    Group facts by concept tag in a single pass, newest period_end first.
 
-def _generate_period_id(fiscal_period: str, end_date: date) -> str:
+    Equivalent to running
+    facts.query().by_concept(tag, True).sort_by("period_end", ascending=False)
+    for each tag, but each of those queries scans every fact, so this scans
+    the fact list once instead of once per tag.
+    """
+    grouped: Dict[str, list] = {tag: [] for tag in tags}
+    for f in facts.get_all_facts():
+        matched = grouped.get(f.concept)
+        if matched is not None:
+            matched.append(f)
+    for matched in grouped.values():
+        matched.sort(key=lambda f: f.period_end or date.min, reverse=True)
+    return grouped
+
+
+@lru_cache(maxsize=256)
+def _generate_period_id(fiscal_period: str, year: int) -> str:
     """
     Generate a period ID in the format "Q1 2024" or "FY 2023".
 
+    Cached: there are only a handful of fiscal periods per year.
+
     Args:
         fiscal_period: The fiscal period string (Q1, Q2, Q3, FY, etc.)
-        end_date: The period end date
+        year: The year of the period end date
 
     Returns:
         Period ID string (e.g., "Q1 2024", "FY 2023")
     """
     fp = fiscal_period.upper().strip() if fiscal_period else "UNKNOWN"
-    year = end_date.year
     return f"{fp} {year}"
 
 
@@ -360,39 +572,53 @@ def _fact_log_context(
     return ctx
 
 
-def _serialize_company_facts_response(response: CompanyFactsResponse) -> Dict[str, Any]:
+def _serialize_company_facts_response(response: CompanyFactsResponse) -> str:
     """
-    Serialize CompanyFactsResponse to JSON-compatible dictionary.
+    Serialize CompanyFactsResponse to a compact blob for Convex.
+
+    The JSON is zlib-compressed and base64-encoded; repeated keys and concept
+    tags make it compress several times smaller than the raw JSON.
 
     Args:
         response: The CompanyFactsResponse to serialize
 
     Returns:
-        JSON-compatible dictionary
+        Base64-encoded, zlib-compressed JSON string
     """
-    return response.model_dump(mode="json")
+    return base64.b64encode(
+        zlib.compress(response.model_dump_json().encode(), FACTS_BLOB_COMPRESSLEVEL)
+    ).decode("ascii")
 
 
 def _deserialize_company_facts_response(
-    data: Dict[str, Any],
+    data: Union[str, Dict[str, Any]],
 ) -> Optional[CompanyFactsResponse]:
     """
-    Deserialize JSON dictionary to CompanyFactsResponse.
+    Deserialize a Convex facts value to CompanyFactsResponse.
 
     Args:
-        data: JSON dictionary containing CompanyFactsResponse data
+        data: Blob written by _serialize_company_facts_response, or a plain
+            JSON dictionary (records stored before facts were compressed)
 
     Returns:
         CompanyFactsResponse object or None if deserialization fails
     """
     try:
+        if isinstance(data, str):
+            # Blobs are written from a validated model, so parse them straight
+            # into the model without the dict normalization below
+            return CompanyFactsResponse.model_validate_json(
+                zlib.decompress(base64.b64decode(data))
+            )
+
         # Normalize the data to ensure periods have facts field
         # This handles cases where data stored in Convex might be missing facts
         if "periods" in data and isinstance(data["periods"], list):
             for period in data["periods"]:
                 if isinstance(period, dict) and "facts" not in period:
                     logger.debug(
-                        f"Adding missing facts field to period: {period.get('id', 'unknown')}"
+                        "Adding missing facts field to period: %s",
+                        period.get("id", "unknown"),
                     )
                     period["facts"] = []
 
@@ -405,13 +631,13 @@ def _deserialize_company_facts_response(
                         # Use tag as fallback label
                         tag = concept.get("tag", "Unknown")
                         concept["label"] = tag.split(":")[-1] if ":" in tag else tag
-                        logger.debug(f"Adding missing label to concept: {tag}")
+                        logger.debug("Adding missing label to concept: %s", tag)
 
         return CompanyFactsResponse.model_validate(data)
     except Exception as e:
         logger.warning(f"Failed to deserialize CompanyFactsResponse: {e}")
         # Log the problematic data structure for debugging
-        if "periods" in data:
+        if isinstance(data, dict) and "periods" in data:
             logger.debug(
                 f"Periods count: {len(data['periods']) if isinstance(data['periods'], list) else 'not a list'}"
             )
@@ -419,7 +645,7 @@ def _deserialize_company_facts_response(
                 data.get("periods", [])[:2]
             ):  # Log first 2 periods
                 if isinstance(period, dict):
-                    logger.debug(f"Period {i} keys: {list(period.keys())}")
+                    logger.debug("Period %s keys: %s", i, list(period))
         return None
 
 
@@ -429,8 +655,9 @@ class EdgarService:
     @staticmethod
     def get_company_by_ticker(ticker: str) -> Optional[Company]:
         """Get a company by its ticker symbol."""
+        ensure_edgar_initialized()
         try:
-            company = Company(ticker)
+            company = _get_company(ticker.upper())
             if company.not_found:
                 logger.warning(f"Company not found for ticker {ticker}")
                 return None
@@ -460,16 +687,17 @@ class EdgarService:
             CompanyNotFoundError: If company cannot be found
             EdgarUnavailableError: If Edgar/SEC is unavailable
         """
+        ensure_edgar_initialized()
         try:
             # Determine if identifier is CIK or ticker
             is_cik = _is_cik(identifier)
 
             if is_cik:
                 cik_int = int(_normalize_cik(identifier))
-                company = Company(cik_int)
+                company = _get_company(cik_int)
                 cik = str(cik_int).zfill(10)
             else:
-                company = Company(identifier)  # ticker; case-insensitive
+                company = _get_company(identifier.upper())  # ticker; case-insensitive
                 cik = ""  # set below after not_found check
 
             if company.not_found:
@@ -481,12 +709,12 @@ class EdgarService:
             # Get ticker for Convex lookup (only if identifier is a ticker)
             ticker_for_cache = identifier.upper() if not is_cik else None
 
-            # Check Convex for cached facts (only for ticker lookups)
-            cached_response = None
-            cached_filing_date = None
+            # Check Convex for cached facts (only for ticker lookups).
+            # The lookup runs in the background while EDGAR facts are fetched.
+            cached_future = None
             if ticker_for_cache:
-                cached_response, cached_filing_date = _query_convex_facts(
-                    ticker_for_cache
+                cached_future = _io_executor.submit(
+                    _query_convex_facts, ticker_for_cache
                 )
 
             # Get company facts (EntityFacts) - use .facts property
@@ -494,13 +722,18 @@ class EdgarService:
             if not facts:
                 raise CompanyNotFoundError(f"Company facts not found: {identifier}")
 
-            # Extract most recent filing date from fresh facts
-            current_filing_date = _extract_most_recent_filing_date(facts)
+            cached_response, cached_filing_date = (
+                cached_future.result() if cached_future else (None, None)
+            )
+
+            # Most recent filing date, collected during the main tag pass below
+            current_filing_date: Optional[datetime] = None
 
             # Check if we should use cached data
             should_use_cache = False
             # if cached_response and cached_filing_date and current_filing_date:
             #     # Use cache if cached filing date is >= current filing date
+            #     # (needs the filing date before the main tag pass below)
             #     if cached_filing_date >= current_filing_date:
             #         should_use_cache = True
             #         logger.info(
@@ -521,9 +754,11 @@ class EdgarService:
             # Process facts via EntityFacts query API
             # Build concepts, periods, and facts separately
             concepts_dict: Dict[str, Concept] = {}  # keyed by concept tag
-            periods_dict: Dict[str, FactPeriod] = {}  # keyed by period ID
-            # Deduplicate facts per period: period_id -> concept -> CompanyFact
-            period_facts_dict: Dict[str, Dict[str, CompanyFact]] = {}
+            # Periods and facts are plain dicts, validated once when the
+            # response is built rather than one model at a time
+            periods_dict: Dict[str, Dict[str, Any]] = {}  # keyed by period ID
+            # Deduplicate facts per period: (period_id, concept) -> CompanyFact dict
+            period_facts_dict: Dict[Tuple[str, str], Dict[str, str]] = {}
             # Valid periods are only relevant when limit is defined and are determined after identifying the most recent period.
             # If period_type is quarterly and first period is "Q3 2025" and limit is 5, then valid periods are "Q3 2025", "Q2 2025", "Q1 2025", "FY 2024", "Q3 2024".
             # If period_type is annual and first period is "FY 2025" and limit is 5, then valid periods are "FY 2025", "FY 2024", "FY 2023", "FY 2022", "FY 2021".
@@ -587,16 +822,20 @@ class EdgarService:
                 # Service revenue
             ]
 
+            # Loop invariants for the per-fact filter below
+            allowed_fiscal_periods = (
+                _ALLOWED_FISCAL_PERIODS.get(period_type) if period_type else None
+            )
+            is_quarterly = period_type == "quarterly"
+
+            matched_by_tag = _facts_by_concept(facts, key_tags)
             for tag in key_tags:
-                query = (
-                    facts.query()
-                    .by_concept(tag, True)
-                    .sort_by("period_end", ascending=False)
-                )
-                matched = query.execute()
+                matched = matched_by_tag[tag]
                 if not matched:
                     continue
 
+                current_filing_date = _max_filing_date(matched, current_filing_date)
+
                 # Get concept metadata from first match
                 label = getattr(matched[0], "label", None)
                 # Fallback to tag if label is None or empty
@@ -616,38 +855,29 @@ class EdgarService:
                 # Process each fact value
                 period_count = 0
                 for f in matched:
-                    if limit and period_count >= limit:
-                        break
+                    try:
+                        fp, val, end_d, start_d, accn, filed = _FACT_FIELDS(f)
+                    except AttributeError:
+                        continue
 
                     # Filter by period_type if specified
-                    if period_type:
-                        fp = (getattr(f, "fiscal_period", "") or "").upper()
-                        if period_type == "annual" and fp != "FY":
-                            continue
-                        if period_type == "quarterly" and fp not in (
-                            "Q1",
-                            "Q2",
-                            "Q3",
-                            "FY",
-                        ):
-                            continue
+                    fp = (fp or "").upper()
+                    if (
+                        allowed_fiscal_periods is not None
+                        and fp not in allowed_fiscal_periods
+                    ):
+                        continue
 
-                    val = getattr(f, "numeric_value", None)
                     if val is None:
                         continue
 
-                    end_d = getattr(f, "period_end", None)
-                    start_d = getattr(f, "period_start", None) or end_d
+                    start_d = start_d or end_d
                     if not end_d:
                         continue
 
-                    if period_type == "quarterly" and end_d.month - start_d.month > 3:
+                    if is_quarterly and end_d.month - start_d.month > 3:
                         continue
 
-                    accn = getattr(f, "accession", None)
-                    filed = getattr(f, "filing_date", None)
-                    fp = (getattr(f, "fiscal_period", "") or "").upper()
-
                     try:
                         start = (
                             start_d.date() if isinstance(start_d, datetime) else start_d
@@ -658,7 +888,7 @@ class EdgarService:
                         fact_period_type = "annual" if fp == "FY" else "quarterly"
 
                         # Generate period ID
-                        period_id = _generate_period_id(fp, end)
+                        period_id = _generate_period_id(fp, end.year)
                         if limit and len(valid_periods) < limit:
                             # Determine and populate all valid periods
                             valid_periods.append(period_id)
@@ -673,35 +903,35 @@ class EdgarService:
                             continue
 
                         # Create or get period
-                        if period_id not in periods_dict:
-                            periods_dict[period_id] = FactPeriod(
-                                id=period_id,
-                                start_date=start,
-                                end_date=end,
-                                period_type=fact_period_type,
-                                accn=str(accn) if accn else None,
-                                filed_at=filed,
-                                facts=[],
-                            )
-                            period_facts_dict[period_id] = {}
-
-                        facts_for_period = period_facts_dict[period_id]
-                        fact = CompanyFact(concept=tag, value=str(val))
+                        period = periods_dict.get(period_id)
+                        if period is None:
+                            period = periods_dict[period_id] = {
+                                "id": period_id,
+                                "start_date": start,
+                                "end_date": end,
+                                "period_type": fact_period_type,
+                                "accn": str(accn) if accn else None,
+                                "filed_at": filed,
+                                "facts": [],
+                            }
+
+                        fact_key = (period_id, tag)
+                        value = str(val)
                         # print("f: {f}")
                         # log_ctx = _fact_log_context(
                         #     f, tag, period_id, val, accn, filed, fp, start, end
                         # )
 
-                        if tag in facts_for_period:
-                            existing = facts_for_period[tag]
-                            if existing.value != fact.value:
+                        existing = period_facts_dict.get(fact_key)
+                        if existing is not None:
+                            if existing["value"] != value:
                                 logger.error(
                                     "Duplicate CompanyFact for same concept '%s' in period '%s': "
                                     "stored value '%s' vs new value '%s'",
                                     tag,
                                     period_id,
-                                    existing.value,
-                                    fact.value,
+                                    existing["value"],
+                                    value,
                                 )
                                 # logger.info(
                                 #     "CompanyFact skipped (conflict). New fact details: %s",
@@ -713,20 +943,21 @@ class EdgarService:
                             #     log_ctx,
                             # )
                         else:
-                            facts_for_period[tag] = fact
+                            fact = {"concept": tag, "value": value}
+                            period_facts_dict[fact_key] = fact
+                            period["facts"].append(fact)
                             # logger.info(
                             #     "CompanyFact stored (first occurrence): %s", log_ctx
                             # )
 
                         period_count += 1
+                        # matched is newest first, so stop as soon as limit is reached
+                        if limit and period_count >= limit:
+                            break
                     except (ValueError, AttributeError, TypeError) as e:
-                        logger.debug(f"Error processing fact: {e}")
+                        logger.debug("Error processing fact: %s", e)
                         continue
 
-            # Populate each period's facts from deduplicated dict
-            for period_id, period in periods_dict.items():
-                period.facts = list(period_facts_dict.get(period_id, {}).values())
-
             # Build the response
             response = CompanyFactsResponse(
                 company=company_info,
@@ -738,10 +969,10 @@ class EdgarService:
             # 1. No cached data exists, or
             # 2. Current filing date is more recent than cached
             if ticker_for_cache and current_filing_date and not should_use_cache:
-                # Store the CompanyFactsResponse
-                _store_convex_facts(ticker_for_cache, response, current_filing_date)
+                # Store the CompanyFactsResponse without blocking the response
+                _enqueue_convex_store(ticker_for_cache, response, current_filing_date)
                 logger.info(
-                    f"Stored facts in Convex for {ticker_for_cache} (filing date: {current_filing_date})"
+                    f"Queued facts for Convex store for {ticker_for_cache} (filing date: {current_filing_date})"
                 )
 
             return response
@@ -750,6 +981,14 @@ class EdgarService:
             if isinstance(e, (CompanyNotFoundError, EdgarUnavailableError)):
                 raise
 
+            # edgartools already throttles to EDGAR_RATE_LIMIT_PER_SEC; a 429 means
+            # SEC blocked us anyway, so callers should back off rather than retry.
+            if isinstance(e, TooManyRequestsError):
+                raise EdgarRateLimitedError(
+                    f"Edgar/SEC rate limit exceeded for: {identifier}",
+                    retry_after=e.retry_after,
+                ) from e
+
             # Try to determine error type
             error_msg = str(e).lower()
             if "not found" in error_msg or "no company" in error_msg:
@@ -1,15 +1,28 @@
 """
 Initialize EdgarTools with identity (required by SEC).
-This should be called once at application startup.
+Call ensure_edgar_initialized() before the first SEC request; it is idempotent.
 """
+from functools import lru_cache
 from edgar import set_identity
 import os
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Set identity for SEC compliance
-# Users should set this in their environment or .env file
-identity = os.getenv("EDGAR_IDENTITY", "storcky@example.com")
-set_identity(identity)
-logger.info(f"EdgarTools initialized with identity: {identity}")
\ No newline at end of file
+
+@lru_cache(maxsize=1)
+def ensure_edgar_initialized() -> None:
+    """Set the EdgarTools identity once per process."""
+    # Set identity for SEC compliance
+    # Users should set this in their environment or .env file
+    identity = os.getenv("EDGAR_IDENTITY", "storcky@example.com")
+    set_identity(identity)
+    logger.info(f"EdgarTools initialized with identity: {identity}")
+
+
+def warm_ticker_lookup() -> None:
+    """Load edgartools' ticker -> CIK table so the first request doesn't pay for it."""
+    # Bundled with edgartools and cached per process; no SEC request is made
+    from edgar.reference.tickers import get_company_cik_lookup
+
+    get_company_cik_lookup()
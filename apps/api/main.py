@@ -1,9 +1,37 @@
 """
 Main entry point for the FastAPI application.
-Run with: uvicorn main:app --reload --port 8000
+Run with: python main.py
+
+Only this entry point splits EDGAR_RATE_LIMIT_PER_SEC across workers and
+gates reload on DEBUG; running uvicorn directly does neither.
 """
+import os
+from pathlib import Path
+
 import uvicorn
-from app.main import app
+from dotenv import load_dotenv
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+    # Read .env here: workers import the app themselves, so the parent
+    # process doesn't load it
+    load_dotenv(dotenv_path=Path(__file__).parent / ".env")
+    # Auto-reload only in development. WEB_CONCURRENCY workers (default 1)
+    # share the SEC budget: edgartools' rate limiter is per process, so split
+    # EDGAR_RATE_LIMIT_PER_SEC across workers to stay under SEC's 10 req/s
+    debug = os.getenv("DEBUG", "").lower() in {"1", "true", "yes"}
+    workers = 1 if debug else int(os.getenv("WEB_CONCURRENCY") or 1)
+    rate_limit = int(os.getenv("EDGAR_RATE_LIMIT_PER_SEC") or 9)
+    os.environ["EDGAR_RATE_LIMIT_PER_SEC"] = str(max(1, rate_limit // workers))
+    # uvloop/httptools ship with uvicorn[standard]; request them explicitly so a
+    # missing extra fails loudly instead of silently falling back to asyncio/h11
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=debug,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        # Per-request access lines are only useful while developing
+        access_log=debug,
+    )
@@ -4,6 +4,15 @@ import httpx
 from httpx import ASGITransport
 
 from app.main import app
+from app.services import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """Keep the in-process response cache from leaking between tests."""
+    cache.clear_local_cache()
+    yield
+    cache.clear_local_cache()
 
 
 @pytest.fixture
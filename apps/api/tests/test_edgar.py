@@ -0,0 +1,174 @@
+"""Tests for EdgarService helpers."""
+from datetime import date, datetime
+from unittest.mock import patch
+
+import httpx
+import orjson
+import pytest
+
+from app.models.schemas import (
+    CompanyFactsResponse,
+    CompanyInfo,
+    Concept,
+    FactPeriod,
+    CompanyFact,
+)
+from app.main import app
+from app.services import edgar
+
+
+@pytest.fixture
+def convex(monkeypatch):
+    """Route Convex calls to an in-memory fake keyed by ticker."""
+    store = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = orjson.loads(request.content)
+        args = body["args"]
+        if request.url.path == "/api/mutation":
+            records = args["records"] if "records" in args else [args]
+            for record in records:
+                store[record["ticker"]] = {
+                    "facts": record["facts"],
+                    "filingDate": record["filingDate"],
+                }
+            return httpx.Response(200, json={"status": "success", "value": None})
+        return httpx.Response(
+            200, json={"status": "success", "value": store.get(args["ticker"])}
+        )
+
+    edgar.clear_edgar_caches()
+    monkeypatch.setenv("CONVEX_URL", "https://convex.test")
+    edgar._get_convex_url.cache_clear()
+    monkeypatch.setattr(
+        edgar, "_http_client", httpx.Client(transport=httpx.MockTransport(handler))
+    )
+    yield store
+    edgar.close_http_client()
+    edgar.clear_edgar_caches()
+    edgar._get_convex_url.cache_clear()
+
+
+def test_convex_store_and_query_round_trip(convex):
+    """Facts stored in Convex are read back as an equal CompanyFactsResponse."""
+    response = CompanyFactsResponse(
+        company=CompanyInfo(name="Test Co", cik="0001234567", ticker="TEST"),
+        concepts=[Concept(tag="Revenues", label="Revenues", unit="USD")],
+        periods=[
+            FactPeriod(
+                id="Q1 2025",
+                start_date=date(2025, 1, 1),
+                end_date=date(2025, 3, 31),
+                period_type="quarterly",
+                facts=[CompanyFact(concept="Revenues", value="1000000")],
+            )
+        ],
+    )
+    filing_date = datetime(2025, 5, 1, 12, 0)
+
+    assert edgar._store_convex_facts("TEST", response, filing_date)
+    edgar.clear_edgar_caches()
+    cached, cached_filing_date = edgar._query_convex_facts("TEST")
+
+    assert cached == response
+    assert cached_filing_date == filing_date
+    assert isinstance(convex["TEST"]["facts"], str)
+
+
+def test_convex_query_reads_uncompressed_records(convex):
+    """Records stored as a plain JSON dict are still readable."""
+    convex["TEST"] = {
+        "facts": {
+            "company": {"name": "Test Co", "cik": "0001234567", "ticker": "TEST"},
+            "concepts": [{"tag": "us-gaap:Revenues", "label": None, "unit": "USD"}],
+            "periods": [],
+        },
+        "filingDate": 1746100800000,
+    }
+
+    cached, _ = edgar._query_convex_facts("TEST")
+
+    assert cached.company.name == "Test Co"
+    assert cached.concepts[0].label == "Revenues"
+
+
+def test_queued_convex_writes_are_batched(convex):
+    """Writes queued together are stored and readable after a flush."""
+    filing_date = datetime(2025, 5, 1, 12, 0)
+    for ticker in ("AAA", "BBB"):
+        response = CompanyFactsResponse(
+            company=CompanyInfo(name=ticker, cik="0001234567", ticker=ticker)
+        )
+        edgar._enqueue_convex_store(ticker, response, filing_date)
+
+    edgar.flush_convex_writes()
+    edgar.clear_edgar_caches()
+
+    assert set(convex) == {"AAA", "BBB"}
+    cached, _ = edgar._query_convex_facts("BBB")
+    assert cached.company.name == "BBB"
+
+
+def test_failed_batch_falls_back_to_single_writes(convex, monkeypatch):
+    """Records from a rejected batch mutation are posted one by one."""
+    run_mutation = edgar._run_convex_mutation
+
+    def reject_batches(convex_url, path, args):
+        if path == "companyFacts:storeCompanyFactsBatch":
+            return False
+        return run_mutation(convex_url, path, args)
+
+    monkeypatch.setattr(edgar, "_run_convex_mutation", reject_batches)
+    filing_date = datetime(2025, 5, 1, 12, 0)
+    records = [
+        (
+            ticker,
+            CompanyFactsResponse(
+                company=CompanyInfo(name=ticker, cik="0001234567", ticker=ticker)
+            ),
+            filing_date,
+        )
+        for ticker in ("AAA", "BBB")
+    ]
+
+    assert edgar._store_convex_facts_batch(records)
+    assert set(convex) == {"AAA", "BBB"}
+
+
+async def test_lifespan_shutdown_posts_queued_writes(convex):
+    """Writes still queued at shutdown are posted before the client closes."""
+    response = CompanyFactsResponse(
+        company=CompanyInfo(name="Test Co", cik="0001234567", ticker="TEST")
+    )
+
+    async with app.router.lifespan_context(app):
+        edgar._enqueue_convex_store("TEST", response, datetime(2025, 5, 1, 12, 0))
+
+    assert "TEST" in convex
+    assert edgar._convex_writer is None
+
+
+def test_convex_query_miss(convex):
+    """A ticker with nothing stored returns (None, None)."""
+    assert edgar._query_convex_facts("NOPE") == (None, None)
+
+
+def test_company_is_reused_across_calls():
+    """Company objects are cached per identifier."""
+    edgar.clear_edgar_caches()
+    with patch.object(edgar, "Company") as company_cls:
+        assert edgar._get_company("AAPL") is edgar._get_company("AAPL")
+        edgar._get_company(320193)
+    assert company_cls.call_count == 2
+    edgar.clear_edgar_caches()
+
+
+def test_filing_datetime_normalizes_supported_types():
+    """Dates, datetimes and ISO strings become datetimes; anything else is None."""
+    assert edgar._filing_datetime(date(2025, 5, 1)) == datetime(2025, 5, 1)
+    assert edgar._filing_datetime(datetime(2025, 5, 1, 9, 30)) == datetime(
+        2025, 5, 1, 9, 30
+    )
+    assert edgar._filing_datetime("2025-05-01") == datetime(2025, 5, 1)
+    assert edgar._filing_datetime("not a date") is None
+    assert edgar._filing_datetime(None) is None
@@ -1,5 +1,7 @@
 """Smoke tests for the API."""
-from unittest.mock import patch
+import asyncio
+import json
+from unittest.mock import AsyncMock, patch
 from datetime import date
 
 from app.models.schemas import (
@@ -9,6 +11,7 @@ from app.models.schemas import (
     FactPeriod,
     CompanyFact,
 )
+from app.services import cache
 
 
 async def test_root(client):
@@ -40,6 +43,18 @@ async def test_financial_route_404_on_unknown_ticker(mock_get_facts, client):
     assert "not found" in response.json()["detail"].lower()
 
 
+@patch("app.routes.financial.EdgarService.get_company_facts")
+async def test_financial_route_429_when_rate_limited(mock_get_facts, client):
+    """Financial route returns 429 with Retry-After when SEC rate limits us."""
+    from app.services.edgar import EdgarRateLimitedError
+
+    mock_get_facts.side_effect = EdgarRateLimitedError("rate limited", retry_after=30)
+
+    response = await client.get("/api/financial/TEST")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "30"
+
+
 @patch("app.routes.financial.EdgarService.get_company_facts")
 async def test_financial_route_returns_data(mock_get_facts, client):
     """Financial route returns company facts when found."""
@@ -65,3 +80,123 @@ async def test_financial_route_returns_data(mock_get_facts, client):
     data = response.json()
     assert data["company"]["ticker"] == "TEST"
     assert data["company"]["name"] == "Test Co"
+
+
+@patch("app.routes.financial.EdgarService.get_company_facts")
+@patch("app.routes.financial.cache.get_cached", new_callable=AsyncMock)
+async def test_financial_route_serves_cache_hit(mock_get_cached, mock_get_facts, client):
+    """Financial route serves cached payloads without calling EDGAR."""
+    cached = CompanyFactsResponse(
+        company=CompanyInfo(name="Test Co", cik="0001234567", ticker="TEST"),
+    )
+    body = cached.model_dump_json().encode()
+    mock_get_cached.return_value = (body, cache.etag_for(body))
+
+    response = await client.get("/api/financial/test")
+    assert response.status_code == 200
+    assert response.headers["X-Cache"] == "HIT"
+    assert response.json()["company"]["name"] == "Test Co"
+    mock_get_cached.assert_awaited_once_with("ff:TEST:quarterly:4")
+    mock_get_facts.assert_not_called()
+
+
+@patch("app.routes.financial.EdgarService.get_company_facts")
+async def test_financial_route_caches_in_process(mock_get_facts, client):
+    """Repeated requests for a ticker are served from the in-process cache."""
+    mock_get_facts.return_value = CompanyFactsResponse(
+        company=CompanyInfo(name="Test Co", cik="0001234567", ticker="TEST"),
+    )
+
+    first = await client.get("/api/financial/TEST")
+    second = await client.get("/api/financial/test")
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+    mock_get_facts.assert_called_once()
+
+
+@patch("app.routes.financial.EdgarService.get_company_facts")
+async def test_financial_route_conditional_get(mock_get_facts, client):
+    """Financial route returns 304 when If-None-Match matches the ETag."""
+    mock_get_facts.return_value = CompanyFactsResponse(
+        company=CompanyInfo(name="Test Co", cik="0001234567", ticker="TEST"),
+    )
+
+    first = await client.get("/api/financial/TEST")
+    etag = first.headers["ETag"]
+    # Weak, since the same entity may be sent gzip-encoded or not
+    assert etag.startswith('W/"')
+    second = await client.get(
+        "/api/financial/TEST", headers={"If-None-Match": etag}
+    )
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["ETag"] == etag
+
+
+@patch("app.routes.financial.EdgarService.get_company_facts")
+async def test_financial_route_coalesces_concurrent_requests(mock_get_facts, client):
+    """Concurrent requests for one ticker share a single EDGAR fetch."""
+    mock_get_facts.return_value = CompanyFactsResponse(
+        company=CompanyInfo(name="Test Co", cik="0001234567", ticker="TEST"),
+    )
+
+    responses = await asyncio.gather(
+        *(client.get("/api/financial/TEST") for _ in range(5))
+    )
+    assert all(r.status_code == 200 for r in responses)
+    mock_get_facts.assert_called_once()
+
+
+@patch("app.routes.financial.EdgarService.get_company_facts")
+async def test_financial_stream_returns_ndjson(mock_get_facts, client):
+    """Stream route emits a company/concepts line then one line per period."""
+    mock_get_facts.return_value = CompanyFactsResponse(
+        company=CompanyInfo(name="Test Co", cik="0001234567", ticker="TEST"),
+        concepts=[Concept(tag="Revenues", label="Revenues", unit="USD")],
+        periods=[
+            FactPeriod(
+                id=period_id,
+                start_date=date(2025, 1, 1),
+                end_date=date(2025, 3, 31),
+                period_type="quarterly",
+                facts=[CompanyFact(concept="Revenues", value="1000000")],
+            )
+            for period_id in ("Q2 2025", "Q1 2025")
+        ],
+    )
+
+    response = await client.get("/api/financial/TEST/stream")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0]["company"]["ticker"] == "TEST"
+    assert [line["id"] for line in lines[1:]] == ["Q2 2025", "Q1 2025"]
+
+
+@patch("app.routes.financial.EdgarService.get_company_facts")
+async def test_financial_batch_reports_per_ticker_errors(mock_get_facts, client):
+    """Batch route returns facts for good tickers and errors for bad ones."""
+    from app.services.edgar import CompanyNotFoundError
+
+    def get_facts(ticker, **kwargs):
+        if ticker == "BAD":
+            raise CompanyNotFoundError(f"Company not found: {ticker}")
+        return CompanyFactsResponse(
+            company=CompanyInfo(name="Test Co", cik="0001234567", ticker=ticker),
+        )
+
+    mock_get_facts.side_effect = get_facts
+
+    response = await client.post(
+        "/api/financial/batch", json={"tickers": ["test", "BAD", "TEST"]}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 2
+    assert data[0]["company"]["ticker"] == "TEST"
+    assert data[1] == {
+        "ticker": "BAD",
+        "status": 404,
+        "error": "Company not found: BAD",
+    }
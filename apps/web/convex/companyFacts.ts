@@ -59,3 +59,33 @@ export const storeCompanyFacts = mutation({
     return { success: true }
   },
 })
+
+/**
+ * Store company facts for several tickers in one mutation.
+ * Same semantics as storeCompanyFacts: each record is inserted as a new row.
+ */
+export const storeCompanyFactsBatch = mutation({
+  args: {
+    records: v.array(
+      v.object({
+        ticker: v.string(),
+        facts: v.any(), // JSON blob
+        filingDate: v.number(), // timestamp
+      })
+    ),
+  },
+  handler: async (ctx, args) => {
+    const now = Date.now()
+
+    for (const { ticker, facts, filingDate } of args.records) {
+      await ctx.db.insert("companyFacts", {
+        ticker: ticker.toUpperCase(),
+        facts,
+        filingDate,
+        updatedAt: now,
+      })
+    }
+
+    return { success: true, count: args.records.length }
+  },
+})
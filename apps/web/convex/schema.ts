@@ -4,7 +4,7 @@ import { v } from "convex/values"
 export default defineSchema({
   companyFacts: defineTable({
     ticker: v.string(),
-    facts: v.any(), // JSON blob storing the serialized EntityFacts data
+    facts: v.any(), // serialized CompanyFactsResponse (base64 zlib JSON; older rows are plain JSON)
     filingDate: v.number(), // timestamp of the most recent filing date
     updatedAt: v.number(), // timestamp when record was created
   }).index("by_ticker", ["ticker"]),